@@ -1,17 +1,42 @@
 #!/usr/bin/env python3
 
-from typing import Iterator
-from math import pow
-from xml.dom import minidom
-from xml.dom.minidom import Document, Element, Text
-from xml.dom.minicompat import NodeList
+from typing import Iterator, Iterable, BinaryIO, Callable
+from xml.etree import ElementTree
+from xml.etree.ElementTree import Element
 import gzip
+import zlib
+import re
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
 from tomllib import load as load_toml
 from dataclasses import dataclass, asdict
+import os
+import gc
+import tempfile
 import pickle
+from array import array
+from collections import Counter
+from io import BytesIO
+from functools import lru_cache
+from contextlib import contextmanager, closing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Lock
+from sys import intern
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+try:
+	import rapidgzip  # optional: parallel gzip decompression
+except ImportError:
+	rapidgzip = None
+try:
+	from isal import igzip  # optional: faster gzip decompression by ISA-L
+except ImportError:
+	igzip = None
+try:
+	from lxml import etree as lxml_etree  # optional: faster stream parsing of repositories meta files
+except ImportError:
+	lxml_etree = None
 
 
 VERSION = '2025.5'
@@ -20,8 +45,17 @@ DEFAULT_REPOS_CACHE = '.repos_cache'
 DOWNLOAD_LOG_FILE_NAME = '.download.log'
 CONF_TOML_FILE_NAME = '.conf.toml'
 PACKAGES_CACHE_FILE_NAME = '.packages.bin'
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # bytes
+DOWNLOAD_PART_SUFFIX = '.part'  # file is downloaded to temporary file
+CACHE_BUFFER_SIZE = 1 << 20  # bytes; meta cache file write buffer
+DOWNLOAD_WORKERS = 16  # default files downloaded in parallel, HTTP connections pool size
 DEVEL_PACKAGE_NAMES = ('-devel', '-test', '-tests', '-debuginfo', '-debugsource', 'linux-headers', '-sysroot')
-PACKAGE_CACHE_HEADER = ('PACKAGE_CACHE', '2025.5')  # magic, version
+DEVEL_PACKAGE_NAMES_RE = re.compile('|'.join(map(re.escape, DEVEL_PACKAGE_NAMES)))  # any of DEVEL_PACKAGE_NAMES
+PACKAGE_CACHE_HEADER = ('PACKAGE_CACHE', '2026.10.6')  # magic, version
+XML_NS_COMMON = '{http://linux.duke.edu/metadata/common}'
+XML_NS_RPM = '{http://linux.duke.edu/metadata/rpm}'
+XML_NS_FILELISTS = '{http://linux.duke.edu/metadata/filelists}'
+XML_NS_REPO = '{http://linux.duke.edu/metadata/repo}'
 
 
 class MissingArgument(Exception): pass
@@ -49,10 +83,11 @@ class Relation:
 
 
 class Package:
-	__slots__ = ('name', 'arch', 'version', 'rel', 'files', 'href', 'provides', 'requires', 'summary', 'description', 'size', 'size_installed', 'repo')
+	__slots__ = ('name', 'arch', 'version', 'rel', '_files', 'href', 'provides', 'requires', 'summary', 'description', 'size', 'size_installed', 'repo',
+		'_provides_index', '_files_index')
 
 	def __init__(self, name: str, arch: str, version: str, rel: str,
-			files: tuple[str] | None = None,
+			files: tuple[str] | bytes | None = None,
 			href: str | None = None,
 			provides: tuple[Relation] | None = None,
 			requires: tuple[Relation] | None = None,
@@ -62,12 +97,14 @@ class Package:
 			repo: str | None = None) -> None:
 		self.name, self.arch = name, arch
 		self.version, self.rel = version, rel
-		self.files = files
+		self._files = files  # files or NUL-terminated UTF-8 files blob; blob is decoded on demand
 		self.href = href
 		self.provides, self.requires = provides, requires
 		self.summary, self.description = summary, description if summary != (description or '').rstrip('.') else None
 		self.size, self.size_installed = size, size_installed
 		self.repo = repo
+		self._provides_index: dict[str, tuple[Relation]] | None = None
+		self._files_index: frozenset[str] | None = None
 
 	def __str__(self):
 		return self.to_str(True)
@@ -80,39 +117,60 @@ class Package:
 	def __hash__(self):
 		return hash((self.repo, self.name, self.arch, self.version))
 
+	@property
+	def files(self) -> tuple[str] | None:
+		if isinstance(self._files, bytes):
+			self._files = tuple(self._files.decode().split('\0')[:-1])
+		return self._files
+
+	@files.setter
+	def files(self, files: tuple[str] | bytes | None):
+		self._files, self._files_index = files, None
+
+	def files_blob(self) -> bytes:
+		'returns NUL-terminated UTF-8 files blob; used for meta cache'
+		if isinstance(self._files, bytes):
+			return self._files
+		return ''.join(f'{x}\0' for x in self._files or ()).encode()
+
+	def _get_provides_index(self) -> dict[str, tuple[Relation]]:
+		'returns provides by name; created once on demand'
+		if self._provides_index is None:
+			index: dict[str, list[Relation]] = {}
+			for provide in self.provides or []:
+				index.setdefault(provide.name, []).append(provide)
+			self._provides_index = {k: tuple(v) for k, v in index.items()}
+		return self._provides_index
+
+	def _get_files_index(self) -> frozenset[str]:
+		'returns files set; created once on demand'
+		if self._files_index is None:
+			self._files_index = frozenset(self.files or [])
+		return self._files_index
+
 	def iter_relations(self, provides: 'Package', reverse = False) -> Iterator[tuple[Relation, Relation | None]]:
 		'iters: (Relation, Relation) self.requires->provides.provides; (Relation, None) to file self.requires->provides.files'
 		if reverse:
-			for require in provides.requires or []:
-				if require.name.startswith('/'):
-					for file_path in self.files or []:
-						if file_path == require.name:
-							yield require, None
-				else:
-					for provide in self.provides or []:
-						if provide.provides(require):
-							yield require, provide
+			requires, provides = provides.requires, self
 		else:
-			for require in self.requires or []:
-				if require.name.startswith('/'):
-					# iters: Relation, None # Relation to package file
-					for file_path in provides.files or []:
-						if file_path == require.name:
-							yield require, None
-				else:
-					# iters: Relation, Relation
-					for provide in provides.provides or []:
-						if require.provides(provide):
-							yield require, provide
+			requires = self.requires
+		for require in requires or []:
+			if require.name.startswith('/'):
+				# iters: Relation, None # Relation to package file
+				if require.name in provides._get_files_index():
+					yield require, None
+			else:
+				# iters: Relation, Relation
+				for provide in provides._get_provides_index().get(require.name, ()):
+					yield require, provide
 
 	def is_provides(self, provides: tuple[str]) -> bool:
 		'returns True if packet provides relations; used for filters'
 		for provide_ in provides or []:
 			if provide_.startswith('/'):
 				# relation to file
-				for file_path in self.files or []:
-					if file_path == provide_:
-						return True
+				if provide_ in self._get_files_index():
+					return True
 			else:
 				# relation to relation
 				for provide in self.provides or []:
@@ -133,43 +191,172 @@ class Package:
 		if self.files:
 			if file_path_filters:
 				# return files according filter
-				for file_path in self.files:
-					if self.is_text_filtered(file_path, file_path_filters):
-						yield file_path
+				yield from filter(_get_text_filters_match(file_path_filters), self.files)
 			else:
 				# return files
-				for file in self.files:
-					yield file
+				yield from self.files
 
 	def has_files(self, file_name_filters: tuple[str]) -> bool:
+		if isinstance(self._files, bytes) and not any(x.removeprefix('^').encode() in self._files for x in file_name_filters):
+			return False  # no filter is found in files blob: skip decoding
 		return any(self.iter_files(file_name_filters))
 
 	def to_str(self, arch = False, version = False, file = False, summary = False, relations = False,
 			files = False, files_filter: tuple[str] | None = None, size = False, repo = True) -> str:
 		'returns multi-line string with package optional info'
-		return ' '.join(filter(lambda x: x, (self.repo if self.repo and repo else '', self.name, self.arch if arch else '',
-			self.version if version else '', self.rel if version else '', (self.href or '') if file else '',
-			f'({format_size(self.size)})' if size else '',
-			'\n\t' + '\n\t'.join(filter(lambda x: x, (self.summary, self.description))) if summary else '',
-			'\n\t' + '\n\t'.join(self.iter_files(files_filter)) if files and self.files else '',
-			'\n\tPROVIDES:' if relations and self.provides else '',
-			'\n\t' + '\n\t'.join(tuple(map(str, self.provides))) if relations and self.provides else '',
-			'\n\tREQUIRES:' if relations and self.requires else '',
-			'\n\t' + '\n\t'.join(tuple(map(str, self.requires))) if relations and self.requires else '',
-			)))
+		parts = [self.repo] if self.repo and repo else []
+		parts.append(self.name)
+		if arch and self.arch:
+			parts.append(self.arch)
+		if version:
+			if self.version:
+				parts.append(self.version)
+			if self.rel:
+				parts.append(self.rel)
+		if file and self.href:
+			parts.append(self.href)
+		if size:
+			parts.append(f'({format_size(self.size)})')
+		if summary:
+			parts.append('\n\t' + '\n\t'.join(x for x in (self.summary, self.description) if x))
+		if files and self.files:
+			parts.append('\n\t' + '\n\t'.join(self.iter_files(files_filter)))
+		if relations:
+			if self.provides:
+				parts.append('\n\tPROVIDES:')
+				parts.append('\n\t' + '\n\t'.join(map(str, self.provides)))
+			if self.requires:
+				parts.append('\n\tREQUIRES:')
+				parts.append('\n\t' + '\n\t'.join(map(str, self.requires)))
+		return ' '.join(parts)
 
 	@classmethod
 	def is_text_filtered(cls, text: str, filters: tuple[str] | None) -> bool:
 		'returns False - not passed'
 		if not filters:
 			return True  # no file filter
-		for filter in filters:
-			if filter.startswith('^'):
-				if text.startswith(filter[1:]):
-					return True
-			elif filter in text:
-				return True
-		return False
+		return bool(_get_text_filters_match(filters)(text))
+
+
+class PackageTable:
+	'packages as struct of arrays: column per package field, files and relations are flattened with offsets; used for meta cache'
+	COLUMNS = ('names', 'archs', 'archs_values', 'versions', 'rels', 'hrefs', 'summaries', 'descriptions', 'sizes', 'sizes_installed',
+		'repos', 'repos_values', 'files', 'files_offsets', 'relations', 'provides', 'provides_offsets', 'requires', 'requires_offsets')
+	__slots__ = COLUMNS + ('archs_ids', 'repos_ids', 'relations_ids', 'relations_cache')
+
+	def __init__(self) -> None:
+		self.names, self.versions, self.rels = [], [], []
+		self.hrefs, self.summaries, self.descriptions = [], [], []
+		# few distinct values: dictionary encoded columns, indexes of unique values
+		self.archs, self.archs_values, self.archs_ids = array('H'), [], {}
+		self.repos, self.repos_values, self.repos_ids = array('H'), [], {}
+		self.sizes, self.sizes_installed = array('Q'), array('Q')
+		self.files, self.files_offsets = bytearray(), array('Q', (0,))  # NUL-terminated UTF-8 files blob, byte offsets
+		# unique relations: names, flags, vers, rels; packages relations are indexes of unique relations
+		self.relations = ([], [], [], [])
+		self.provides, self.provides_offsets = array('I'), array('I', (0,))
+		self.requires, self.requires_offsets = array('I'), array('I', (0,))
+		self.relations_ids: dict[tuple, int] = {}  # unique relation: index
+		self.relations_cache: list[Relation | None] = []
+
+	def __len__(self) -> int:
+		return len(self.names)
+
+	@classmethod
+	def from_packages(cls, packages: Iterable[Package]) -> 'PackageTable':
+		table = cls()
+		for package in packages:
+			table.append(package)
+		return table
+
+	@classmethod
+	def from_columns(cls, columns: dict) -> 'PackageTable':
+		'returns table from columns; see columns()'
+		table = cls.__new__(cls)
+		for name in cls.COLUMNS:
+			setattr(table, name, columns[name])
+		table.archs_ids = table.repos_ids = table.relations_ids = None
+		table.relations_cache = [None] * len(table.relations[0])
+		return table
+
+	def columns(self) -> dict:
+		'returns columns by name; used to serialize table; files blob can be serialized out-of-band'
+		columns = {name: getattr(self, name) for name in self.COLUMNS}
+		columns['files'] = pickle.PickleBuffer(self.files)
+		return columns
+
+	def append(self, package: Package):
+
+		def encode(values: list, ids: dict, value) -> int:
+			'returns index of value in unique values'
+			if (value_id := ids.get(value)) is None:
+				value_id = ids[value] = len(values)
+				values.append(value)
+			return value_id
+
+		def append_relations(ids: array, offsets: array, relations: Iterable[Relation] | None):
+			for relation in relations or ():
+				key = (relation.name, relation.flags, relation.ver, relation.rel)
+				if (relation_id := self.relations_ids.get(key)) is None:
+					# new unique relation
+					relation_id = self.relations_ids[key] = len(self.relations_cache)
+					self.relations_cache.append(relation)
+					names, flags, vers, rels = self.relations
+					names.append(intern(relation.name))
+					flags.append(intern(relation.flags) if relation.flags else relation.flags)
+					vers.append(relation.ver)
+					rels.append(relation.rel)
+				ids.append(relation_id)
+			offsets.append(len(ids))
+
+		self.names.append(package.name)
+		self.archs.append(encode(self.archs_values, self.archs_ids, package.arch))
+		self.versions.append(package.version)
+		self.rels.append(package.rel)
+		self.hrefs.append(package.href)
+		self.summaries.append(package.summary)
+		self.descriptions.append(package.description)
+		self.sizes.append(package.size)
+		self.sizes_installed.append(package.size_installed)
+		self.repos.append(encode(self.repos_values, self.repos_ids, package.repo))
+		self.files += package.files_blob()
+		self.files_offsets.append(len(self.files))
+		append_relations(self.provides, self.provides_offsets, package.provides)
+		append_relations(self.requires, self.requires_offsets, package.requires)
+
+	def relations_mask(self, filters: tuple[str]) -> bytes:
+		'returns mask of unique relations which names contain any of filters; filters are matched once for each unique relation'
+		return bytes(any(x in name for x in filters) for name in self.relations[0])
+
+	def has_relations(self, ids: array, offsets: array, i: int, mask: bytes) -> bool:
+		'returns True if package relations (provides or requires) are masked; see relations_mask()'
+		return any(mask[x] for x in ids[offsets[i]:offsets[i+1]])
+
+	def files_count(self) -> int:
+		return self.files.count(0)
+
+	def relation(self, relation_id: int) -> Relation:
+		'returns unique relation by index; relation object is created once and shared by packages'
+		if (relation := self.relations_cache[relation_id]) is None:
+			relation = self.relations_cache[relation_id] = Relation(*(x[relation_id] for x in self.relations))
+		return relation
+
+	def package(self, i: int) -> Package:
+		'returns package by index'
+
+		def get_relations(ids: array, offsets: array) -> tuple[Relation] | None:
+			if (start := offsets[i]) != (end := offsets[i+1]):
+				return tuple(map(self.relation, ids[start:end]))
+			return None
+
+		return Package(self.names[i], self.archs_values[self.archs[i]], self.versions[i], self.rels[i],
+			bytes(memoryview(self.files)[self.files_offsets[i]:self.files_offsets[i+1]]) or None,
+			self.hrefs[i],
+			get_relations(self.provides, self.provides_offsets),
+			get_relations(self.requires, self.requires_offsets),
+			self.summaries[i], self.descriptions[i],
+			self.sizes[i], self.sizes_installed[i],
+			self.repos_values[self.repos[i]])
 
 
 class Repomd:
@@ -188,39 +375,34 @@ class PackageNameFilter:
 		def __init__(self, pattern: str):
 			self.is_inverse = pattern.startswith('!')
 			self.pattern = pattern[1:] if self.is_inverse else pattern
-		def is_match(self, name: str) -> bool:
-			return False
+		def get_regex(self) -> str:
+			'returns regular expression of filter'
+			return re.escape(self.pattern)
 
 
 	class FilterExactly(FilterBase):
-		def is_match(self, name: str) -> bool:
-			return name == self.pattern
+		def get_regex(self) -> str:
+			return rf'\A{re.escape(self.pattern)}\Z'
 
 
 	class FilterParts(FilterBase):
-		def __init__(self, pattern: str):
-			super().__init__(pattern)
-			self.name_start = pattern + '-'
-			self.name_mid = '-' + pattern + '-'
-			self.name_end = '-' + pattern
-		def is_match(self, name: str) -> bool:
-			return name.startswith(self.name_start) or name.endswith(self.name_end) or self.name_mid in name or \
-				name == self.pattern
+		def get_regex(self) -> str:
+			# pattern as dash separated part: not preceded and not followed by other than dash, as in '-pattern-' in '-name-'
+			return rf'(?<![^-]){re.escape(self.pattern)}(?![^-])'
 
 
 	class FilterText(FilterBase):
-		def is_match(self, name: str) -> bool:
-			return self.pattern in name
+		pass
 
 
 	class FilterStartswith(FilterBase):
-		def is_match(self, name: str) -> bool:
-			return name.startswith(self.pattern)
+		def get_regex(self) -> str:
+			return rf'\A{re.escape(self.pattern)}'
 
 
 	class FilterEndswith(FilterBase):
-		def is_match(self, name: str) -> bool:
-			return name.endswith(self.pattern)
+		def get_regex(self) -> str:
+			return rf'{re.escape(self.pattern)}\Z'
 
 
 	def __init__(self, pattern: str):
@@ -238,16 +420,15 @@ class PackageNameFilter:
 				case _:
 					self.filters.append(self.FilterText(name_pattern_))
 		self.is_all_inverse = all(x.is_inverse for x in self.filters)
+		# compile filters to one regular expression for matching filters and one for inverse filters
+		self.regex, self.inverse_regex = (
+			re.compile('|'.join(regexes)) if (regexes := [x.get_regex() for x in self.filters if x.is_inverse == is_inverse]) else None
+			for is_inverse in (False, True))
 
 	def is_match(self, name: str) -> bool:
-		for filter in self.filters:
-			is_match = filter.is_match(name)
-			if filter.is_inverse:
-				if is_match:
-					return False
-			elif is_match:
-				return True
-		return self.is_all_inverse
+		if self.inverse_regex and self.inverse_regex.search(name):
+			return False
+		return self.is_all_inverse or bool(self.regex.search(name))
 
 
 class PackageSummaryFilter:
@@ -260,130 +441,180 @@ class PackageSummaryFilter:
 		else:
 			self.pattern = pattern
 			self.is_case_insensitive = False
+		self.regex = re.compile(re.escape(self.pattern), re.IGNORECASE if self.is_case_insensitive else 0)
 
 	def is_match(self, package: Package) -> bool:
-		return any(self.pattern in (x.lower() if self.is_case_insensitive else x) for x in (package.summary, package.description) if x)
+		return bool((package.summary and self.regex.search(package.summary))
+			or (package.description and self.regex.search(package.description)))
 
 
+@lru_cache(maxsize=8192)
 def format_size(val: int) -> str:
-	MULTIPLIERS = { 'GB': 9, 'MB': 6, 'kB': 3, 'B': 0, }  # suffix, power of 10
-	for suffix, power_10 in MULTIPLIERS.items():
-		if val >= pow(10, power_10) or power_10 == 0:
-			return f'{val / pow(10, power_10):{'.0f' if power_10 == 0 else '.1f'}} {suffix}'
-
-def _get_tag_value_text(node: NodeList | Element | Text) -> str | None:
-	if issubclass(type(node), NodeList):
-		return _get_tag_value_text(node[0])
-	elif issubclass(type(node), Element):
-		if node.childNodes:
-			return _get_tag_value_text(node.childNodes[0])
-	elif issubclass(type(node), Text):
-		return node.nodeValue
-	return None
+	MULTIPLIERS = ((1_000_000_000, 'GB'), (1_000_000, 'MB'), (1_000, 'kB'))  # multiplier, suffix
+	for multiplier, suffix in MULTIPLIERS:
+		if val >= multiplier:
+			return f'{val / multiplier:.1f} {suffix}'
+	return f'{val} B'
+
+@lru_cache(maxsize=64)
+def _get_text_filters_match(filters: tuple[str]) -> Callable[[str], object]:
+	'returns match function of text filters: ^ starts with, contains otherwise; created once for filters'
+	if len(filters) == 1:
+		# single filter: compiled regular expression
+		return re.compile(rf'\A{re.escape(filters[0][1:])}' if filters[0].startswith('^') else re.escape(filters[0])).search
+	# regular expression alternation of literals is slower than str methods
+	prefixes = tuple(x[1:] for x in filters if x.startswith('^'))
+	texts = tuple(x for x in filters if not x.startswith('^'))
+
+	def match(text: str) -> bool:
+		if text.startswith(prefixes):
+			return True
+		for x in texts:
+			if x in text:
+				return True
+		return False
+
+	return match
 
-def _get_tag_value_text2(node, name: str) -> str | None:
-	if (node2 := node.getElementsByTagName(name)):
-		return _get_tag_value_text(node2[0])
+def _get_tag_value_text(node: Element, tag: str) -> str | None:
+	'returns text of child element or None if element is absent or empty'
+	if (node := node.find(tag)) is not None:
+		return node.text
 	return None
 
-def _open_xml_file(file_path: str) -> Document | None:
-	'returns xml document from .xml.gz file'
+_gzip_parallelization: int | None = None  # decompression threads of process; all CPUs if not set
+
+def _set_gzip_parallelization(threads: int):
+	'sets decompression threads of process: worker processes share CPUs'
+	global _gzip_parallelization
+	_gzip_parallelization = threads
+
+def _open_gzip_file(file_path: str, mode: str = 'rb') -> BinaryIO:
+	'returns binary file object of .gz file; decompress in parallel if rapidgzip is available, else by ISA-L if isal is available'
+	if rapidgzip:
+		if not os.path.isfile(file_path):
+			raise FileNotFoundError(file_path)
+		return rapidgzip.open(file_path, parallelization=_gzip_parallelization or os.cpu_count())
+	return (igzip or gzip).open(file_path, mode)
+
+def _open_xml_file(file_path: str) -> BinaryIO | None:
+	'returns binary file object of .xml or .xml.gz file'
 	match file_path.lower():
 		case p if p.endswith('.xml'): open_ = open
-		case p if p.endswith('.xml.gz'): open_ = gzip.open
+		case p if p.endswith('.xml.gz'): open_ = _open_gzip_file
 		case _:
 			raise NotImplementedError  # support .xml or .xml.gz files only
 	try:
-		with open_(file_path, 'rb') as f:
-			return minidom.parseString(f.read())
+		return open_(file_path, 'rb')
 	except FileNotFoundError: return None
 
-def iter_filelist(root: Document) -> Iterator[Package]:
-	'parse filelist .xml: packages (name, files)'
+def _read_xml_file(file_path: str) -> Element | None:
+	'returns root element of xml document from .xml or .xml.gz file; for small documents only'
+	if (f := _open_xml_file(file_path)):
+		with f:
+			return ElementTree.parse(f).getroot()
+	return None
 
-	for package in root.getElementsByTagName('package'):
-		version = package.getElementsByTagName('version')[0]
-		version, rel = version.getAttributeNode('ver').value, version.getAttributeNode('rel').value
+def _iter_xml_elements(file_path: str, tag: str) -> Iterator[Element]:
+	'iterates elements by tag from .xml or .xml.gz file; stream parse: iterated elements are dropped from memory'
+	with _open_xml_file(file_path) as f:
+		if lxml_etree:
+			# parser filters elements by tag
+			for _, element in lxml_etree.iterparse(f, events=('end',), tag=tag):
+				yield element
+				# drop parsed elements
+				element.clear()
+				while element.getprevious() is not None:
+					del element.getparent()[0]
+		else:
+			events = ElementTree.iterparse(f, events=('start', 'end'))
+			_, root = next(events)
+			for event, element in events:
+				if event == 'end' and element.tag == tag:
+					yield element
+					root.clear()  # drop parsed elements
+
+def iter_filelist(file_path: str) -> Iterator[Package]:
+	'parse filelist .xml file: packages (name, files)'
+
+	for package in _iter_xml_elements(file_path, XML_NS_FILELISTS + 'package'):
+		version = package.find(XML_NS_FILELISTS + 'version')
+		version, rel = version.get('ver'), version.get('rel')
 		files = []
-		for f in package.getElementsByTagName('file'):
-			files.append(_get_tag_value_text(f))
-		yield Package(package.getAttribute('name'), package.getAttribute('arch'), version, rel, files)
+		for f in package.iterfind(XML_NS_FILELISTS + 'file'):
+			files.append(f.text)
+		yield Package(package.get('name'), package.get('arch'), version, rel, files)
 
 def show_filelist(file_path: str):
 	'parse filelist .xml file: packages (name, files)'
 
-	for i, package in enumerate(iter_filelist(_open_xml_file(file_path))):
+	for i, package in enumerate(iter_filelist(file_path)):
 		print(i+1, package)
 
-def iter_primary(root: Document, add_summary: bool = False) -> Iterator[Package]:
+def iter_primary(file_path: str, add_summary: bool = False) -> Iterator[Package]:
 	'parse primary .xml file: packages (name, provides, requires)'
 
-	def get_attr(node, attr_name: str) -> str | None:
-		try:
-			return node.getAttributeNode(attr_name).value
-		except AttributeError:
-			return None
+	def get_relations(node: Element) -> list[Relation]:
+		'returns relations from rpm:entry child elements'
+		return [Relation(entry.get('name'), flags, entry.get('ver'), entry.get('rel')) if (flags := entry.get('flags')) is not None
+			else Relation(entry.get('name'), None, None, None) for entry in node]
 
-	for package in root.getElementsByTagName('package'):
-		_type = package.getAttributeNode('type').value
+	for package in _iter_xml_elements(file_path, XML_NS_COMMON + 'package'):
+		_type = package.get('type')
 		if _type != 'rpm':
 			raise Exception(f'_type != "rpm": {_type}')
-		name = _get_tag_value_text(package.getElementsByTagName('name')[0])
-		arch = _get_tag_value_text(package.getElementsByTagName('arch')[0])
-		summary = _get_tag_value_text(package.getElementsByTagName('summary')[0]) if add_summary else None
-		description = _get_tag_value_text2(package, 'description') if add_summary else None
-		version = package.getElementsByTagName('version')[0]
-		version, rel = version.getAttributeNode('ver').value, version.getAttributeNode('rel').value
-		size = package.getElementsByTagName('size')[0]
-		size, size_installed = map(int, (size.getAttributeNode('package').value, size.getAttributeNode('installed').value))
-		location_href = package.getElementsByTagName('location')[0].getAttributeNode('href').value
-		format = package.getElementsByTagName('format')[0]
-		provides, requires = [], []
-		for entry in format.getElementsByTagName('rpm:provides')[0].getElementsByTagName('rpm:entry'):
-			if entry.hasAttribute('flags'):
-				provides.append(Relation(entry.getAttributeNode('name').value,
-					entry.getAttributeNode('flags').value,
-					entry.getAttributeNode('ver').value,
-					get_attr(entry, 'rel')))
+		nodes = {node.tag: node for node in package}  # package child elements by tag: single pass
+		name = nodes[XML_NS_COMMON + 'name'].text
+		arch = nodes[XML_NS_COMMON + 'arch'].text
+		summary = description = None
+		if add_summary:
+			if (node := nodes.get(XML_NS_COMMON + 'summary')) is not None:
+				summary = node.text
+			if (node := nodes.get(XML_NS_COMMON + 'description')) is not None:
+				description = node.text
+		version = nodes[XML_NS_COMMON + 'version']
+		version, rel = version.get('ver'), version.get('rel')
+		size = nodes[XML_NS_COMMON + 'size']
+		size, size_installed = map(int, (size.get('package'), size.get('installed')))
+		location_href = nodes[XML_NS_COMMON + 'location'].get('href')
+		provides = requires = None
+		for node in nodes[XML_NS_COMMON + 'format']:
+			# format child elements: stop before files when both relations are found
+			if node.tag == XML_NS_RPM + 'provides':
+				provides = get_relations(node)
+			elif node.tag == XML_NS_RPM + 'requires':
+				requires = get_relations(node)
 			else:
-				provides.append(Relation(entry.getAttributeNode('name').value, None, None, None))
-		if (_requires := format.getElementsByTagName('rpm:requires')) and _requires.length:
-			for entry in _requires[0].getElementsByTagName('rpm:entry'):
-				if entry.hasAttribute('flags'):
-					requires.append(Relation(
-						entry.getAttributeNode('name').value,
-						entry.getAttributeNode('flags').value,
-						entry.getAttributeNode('ver').value,
-						get_attr(entry, 'rel')))
-				else:
-					requires.append(Relation(entry.getAttributeNode('name').value, None, None, None))
-		yield Package(name, arch, version, rel, None, location_href, provides, requires, summary, description, size, size_installed)
+				continue
+			if provides is not None and requires is not None:
+				break
+		yield Package(name, arch, version, rel, None, location_href, provides or [], requires or [], summary, description, size, size_installed)
 
 def show_primary(file_path: str):
 	'parse primary .xml file: packages (name, provides, requires)'
 
-	for i, package in enumerate(iter_primary(_open_xml_file(file_path))):
+	for i, package in enumerate(iter_primary(file_path)):
 		print(i+1, package)
 
-def get_repomd(root: Document | None) -> Repomd | None:
+def get_repomd(root: Element | None) -> Repomd | None:
 	'parse xml document from repomd.xml file'
-	if not root:
+	if root is None:
 		return None
-	revision = _get_tag_value_text(root.getElementsByTagName('revision'))
+	revision = _get_tag_value_text(root, XML_NS_REPO + 'revision')
 	if not revision:
 		return None
 	repomd = Repomd(revision)
-	for i, data in enumerate(root.getElementsByTagName('data')):
-		_type = data.getAttributeNode('type').value
+	for data in root.iterfind(XML_NS_REPO + 'data'):
+		_type = data.get('type')
 		if _type == 'primary':
-			repomd.primary_url = data.getElementsByTagName('location')[0].getAttributeNode('href').value
+			repomd.primary_url = data.find(XML_NS_REPO + 'location').get('href')
 		elif _type == 'filelists':
-			repomd.filelists_url = data.getElementsByTagName('location')[0].getAttributeNode('href').value
+			repomd.filelists_url = data.find(XML_NS_REPO + 'location').get('href')
 	return repomd
 
 def show_repomd(file_path: str):
 	'parse xml document from repomd.xml file'
-	if (repomd := get_repomd(_open_xml_file(file_path))):
+	if (repomd := get_repomd(_read_xml_file(file_path))):
 		print(repomd)
 	else:
 		print(f'NOT VALID REPOMD XML FILE: {file_path}')
@@ -391,21 +622,132 @@ def show_repomd(file_path: str):
 def iter_repositories_repomds(file_path: str) -> Iterator[tuple[Repomd, Path]]:
 	'iters (repomd.xml document, repo path) from repositories path with repositories tree: main, oss, non-oss'
 	for repository_path in (x for x in Path(file_path).iterdir() if x.is_dir()):
-		if (repomd := get_repomd(_open_xml_file(str(repository_path.joinpath('repodata', 'repomd.xml'))))):
+		if (repomd := get_repomd(_read_xml_file(str(repository_path.joinpath('repodata', 'repomd.xml'))))):
 			yield repomd, repository_path
 
-def iter_repositories_packages(repos_path: str, add_summary: bool = False, file_list: bool = False) -> Iterator[Package]:
-	'iters packages from repositories path with repositories tree: main, oss, non-oss'
-	for repomd, repository_path in iter_repositories_repomds(repos_path):
-		# print(f'{str(repository_path.joinpath(repomd.primary_url))=}')
-		if file_list:
-			for package in iter_filelist(_open_xml_file(str(repository_path.joinpath(repomd.filelists_url)))):
-				package.repo = repository_path.name
-				yield package
-		else:
-			for package in iter_primary(_open_xml_file(str(repository_path.joinpath(repomd.primary_url))), add_summary):
-				package.repo = repository_path.name
-				yield package
+@contextmanager
+def _gc_disabled() -> Iterator[None]:
+	'disables cyclic garbage collector: packages are created in bulk and have no reference cycles'
+	enabled = gc.isenabled()
+	gc.disable()
+	try:
+		yield
+	finally:
+		if enabled:
+			gc.enable()
+
+def _parse_repository(task: tuple[str, str, str]) -> tuple[bytes, int, int]:
+	'returns (packages table frame, packages count, files count) of repository: primary packages with filelists files; runs in worker process'
+	repo, primary_path, filelists_path = task
+	with _gc_disabled():
+		packages = []
+		for package in iter_primary(primary_path, True):
+			package.repo = repo
+			packages.append(package)
+		# join files to packages by name, arch, version
+		packages_ids = {(x.name, x.arch, x.version, x.rel): x for x in packages}
+		files_count = 0
+		for package_files in iter_filelist(filelists_path):
+			if (package := packages_ids.get((package_files.name, package_files.arch, package_files.version, package_files.rel))):
+				package.files = files = package_files.files_blob()
+				files_count += files.count(0)
+		frame = BytesIO()
+		write_meta_cache_table(frame, PackageTable.from_packages(packages))
+		return frame.getvalue(), len(packages), files_count
+
+def iter_repositories_frames(repos: Iterable[tuple[Repomd, Path]]) -> Iterator[tuple[bytes, int, int]]:
+	'iters (packages table frame, packages count, files count) for each repository in order; repositories are parsed in parallel'
+	tasks = [(repository_path.name, str(repository_path.joinpath(repomd.primary_url)), str(repository_path.joinpath(repomd.filelists_url)))
+		for repomd, repository_path in repos]
+	if (workers := min(len(tasks), cpus := os.cpu_count() or 1)) > 1:
+		# process per repository: packages table is passed back serialized; CPUs are shared by decompression threads of workers
+		with ProcessPoolExecutor(workers, initializer=_set_gzip_parallelization, initargs=(max(1, cpus // workers),)) as executor:
+			yield from executor.map(_parse_repository, tasks)
+	else:
+		yield from map(_parse_repository, tasks)
+
+def write_meta_cache_header(f: BinaryIO, repos_versions: dict[str, str]):
+	'writes meta cache header: size (4 bytes), (magic header, repositories versions); packages follow header'
+	header = pickle.dumps((PACKAGE_CACHE_HEADER, repos_versions))
+	f.write(len(header).to_bytes(4, 'little'))
+	f.write(header)
+
+def read_meta_cache_header(f: BinaryIO) -> dict[str, str] | None:
+	'returns repositories versions from meta cache header or None if not valid cache; packages are not read'
+	size = int.from_bytes(f.read(4), 'little')
+	if size > os.fstat(f.fileno()).st_size - f.tell() or len(header := f.read(size)) != size:
+		return None
+	try:
+		header = pickle.loads(header)
+	except Exception:
+		# damaged cache: any error of unpickling
+		return None
+	# check magic and repositories versions
+	if not isinstance(header, tuple) or len(header) != 2 \
+			or header[0] != PACKAGE_CACHE_HEADER \
+			or not isinstance(header[1], dict):
+		return None
+	return header[1]
+
+def write_meta_cache_table(f: BinaryIO, table: PackageTable):
+	'writes packages table frame: buffers count (4 bytes); size (8 bytes), CRC32 (4 bytes), pickled columns; size, CRC32, raw out-of-band buffer for each buffer; frame per repository follows header'
+	buffers: list[pickle.PickleBuffer] = []
+	data = pickle.dumps(table.columns(), pickle.HIGHEST_PROTOCOL, buffer_callback=buffers.append)
+	f.write((1 + len(buffers)).to_bytes(4, 'little'))
+	for buffer in (data, *(x.raw() for x in buffers)):
+		f.write(len(buffer).to_bytes(8, 'little'))
+		f.write(zlib.crc32(buffer).to_bytes(4, 'little'))
+		f.write(buffer)
+
+def read_meta_cache_table(f: BinaryIO) -> PackageTable | None:
+	'returns packages table from meta cache or None if not valid cache; out-of-band buffers are read directly to bytearray'
+
+	def read_buffer() -> bytearray:
+		size, crc = int.from_bytes(f.read(8), 'little'), int.from_bytes(f.read(4), 'little')
+		if size > file_size - f.tell():
+			# damaged size: buffer is not allocated
+			raise EOFError
+		if f.readinto(buffer := bytearray(size)) != size:
+			raise EOFError
+		if zlib.crc32(buffer) != crc:
+			# damaged cache: not detected by unpickling in out-of-band buffers
+			raise ValueError
+		return buffer
+
+	file_size = os.fstat(f.fileno()).st_size
+	try:
+		data, *buffers = [read_buffer() for _ in range(int.from_bytes(f.read(4), 'little'))]
+		columns = pickle.loads(data, buffers=buffers)
+	except Exception:
+		# damaged cache: any error of unpickling
+		return None
+	if not isinstance(columns, dict) or columns.keys() != set(PackageTable.COLUMNS):
+		return None
+	return PackageTable.from_columns(columns)
+
+def check_meta_cache_tables(f: BinaryIO, count: int) -> bool:
+	'returns True if packages table frames are complete and not damaged by buffers sizes and CRC32; tables are not read, file position is restored'
+	position, file_size = f.tell(), os.fstat(f.fileno()).st_size
+	try:
+		for _ in range(count):
+			if not (buffers_count := int.from_bytes(f.read(4), 'little')):
+				return False
+			for _ in range(buffers_count):
+				if len(header := f.read(12)) != 12:
+					return False
+				size, crc = int.from_bytes(header[:8], 'little'), int.from_bytes(header[8:], 'little')
+				if size > file_size - f.tell():
+					return False
+				# CRC32 by chunks: buffer is not held
+				value = 0
+				while size:
+					chunk = f.read(min(size, CACHE_BUFFER_SIZE))
+					value, size = zlib.crc32(chunk, value), size - len(chunk)
+				if value != crc:
+					return False
+		return True
+	finally:
+		f.seek(position)
 
 if __name__ == '__main__':
 	from sys import argv, exit
@@ -509,6 +851,8 @@ Advanced usage:
 			parser_d.add_argument('-R', '--redownload', action='store_true',
 				help='download packages but keep existing valid files; combines following options: --keep-meta, --keep-conf, --keep-cache')
 			parser_d.add_argument('-D', '--dummy', action='store_true', help='do not download: nor meta, nor packages')
+			parser_d.add_argument('-j', '--jobs', metavar='NUM', type=int, default=DOWNLOAD_WORKERS,
+				help=f'files downloaded in parallel: repositories meta files, packages; default: {DOWNLOAD_WORKERS}')
 
 			parser_a = subparsers.add_parser('architectures', aliases=('a',), help='show architectures data')
 			parser_a.add_argument('-C', action='store_false', help='hide archs counter')
@@ -546,7 +890,10 @@ Advanced usage:
 			parser_fl.add_argument('-p', '--path', metavar='FILE_PATH', nargs='*',
 				help=f'.xml.gz file path; example: primary.xml.gz')
 
-			return parser.parse_args()
+			args = parser.parse_args()
+			if 'jobs' in args and args.jobs < 1:
+				parser_d.error(f'argument -j/--jobs: must be at least 1: {args.jobs}')
+			return args
 
 		def print_package(package: Package, i: int | None = None):
 			'print package info according to comman-line options'
@@ -561,60 +908,85 @@ Advanced usage:
 			for k, v in repos_versions.items():
 				print(f'\t\t{k:>{max_repos_names_len}}: {v}')
 
-		def load_meta_cache() -> tuple[dict[str, str], tuple[Package]]:
-			'returns (repos_versions, packages) from meta cache'
+		def load_meta_cache() -> tuple[dict[str, str], Iterable[PackageTable]]:
+			'returns (repos_versions, packages table for each repository) from meta cache; tables are read on demand: one table is held at once'
 
 			def show_help():
 				print('\tWRONG cache format. Please, refresh cache use command line:')
-				print(f'{Path(argv[0]).name} -r "{str(repos_path.absolute())}" d --dummy')
+				print(f'{Path(argv[0]).name} -r "{repos_path_str}" d --dummy')
+
+			def iter_tables(position: int) -> Iterator[PackageTable]:
+				with open(cache_path, 'rb') as f:
+					f.seek(position)
+					for _ in repos_versions:
+						with _gc_disabled():
+							packages = read_meta_cache_table(f)
+						if packages is None:
+							show_help()
+							exit(-1)
+						yield packages
 
 			# load packages from cache # deserialize packages from binary file
 			if args.verbose:
 				print('Load packages cache...')
+			cache_path = str(repos_path.joinpath(PACKAGES_CACHE_FILE_NAME))
 			try:
-				with open(str(repos_path.joinpath(PACKAGES_CACHE_FILE_NAME).absolute()), 'rb') as f:
-					packages = pickle.load(f)
+				with open(cache_path, 'rb') as f:
+					# deserialize: header (magic header, repositories versions), packages table for each repository
+					# check header and tables frames before packages deserialization: damaged cache is reported before output
+					if (repos_versions := read_meta_cache_header(f)) is None or not check_meta_cache_tables(f, len(repos_versions)):
+						show_help()
+						exit(-1)
+					position = f.tell()
 			except FileNotFoundError:
 				show_help()
 				exit(-1)
-			# deserialize: magic header, repositories versions, packages
-			# check magic and packages
-			if not isinstance(packages, tuple) or len(packages) != 3 \
-					or packages[0] != PACKAGE_CACHE_HEADER \
-					or not isinstance(packages[1], dict) \
-					or not isinstance(packages[2], tuple):
-				show_help()
-				exit(-1)
+			packages = repos_versions, iter_tables(position)
 			if args.verbose:
+				# packages count is shown before packages: all tables are read at once
+				packages = repos_versions, list(packages[1])
 				if args.verbose > 1:
-					print(f'\theader: {', '.join(packages[0])}')
-					print_repos_versions(packages[1])
-				print(f'\tpackages: {len(packages[2]):_}')
+					print(f'\theader: {', '.join(PACKAGE_CACHE_HEADER)}')
+					print_repos_versions(packages[0])
+				print(f'\tpackages: {sum(len(x) for x in packages[1]):_}')
 				if args.verbose > 1:
-					print(f'\tfiles: {sum((len(x.files) for x in packages[2] if x.files)):_}')
-			return packages[1:]
-
-		def load_packages_cache() -> tuple[Package]:
-			'returns packages from meta cache'
-			return load_meta_cache()[1]
-
-		def iter_packages() -> Iterator[Package]:
-			'iterates packages from cache with filters by name, arch'
-			packages = load_packages_cache()
-			for package in packages:
-				# filter package
-				if (exclude_arch and package.arch in exclude_arch) or (arch and package.arch not in arch):
-					# package arch filter
-					continue
-				if args.exclude_devel:
-					# package filter for test/debug/devel
-					if any((x in package.name for x in DEVEL_PACKAGE_NAMES)):
-						continue
-				if package_name_filter and not package_name_filter.is_match(package.name):
-					# package name filter
-					continue
-				# yield package
-				yield package
+					print(f'\tfiles: {sum(x.files_count() for x in packages[1]):_}')
+			return packages
+
+		def load_packages_cache() -> Iterator[PackageTable]:
+			'iters packages tables from meta cache; cache file is closed when iterator is closed'
+			yield from load_meta_cache()[1]
+
+		def iter_packages(provides: tuple[str] | None = None, requires: tuple[str] | None = None) -> Iterator[Package]:
+			'iterates packages from cache with filters by name, arch, relations names'
+			with closing(load_packages_cache()) as tables:
+				for packages in tables:
+					# filter by table columns: only passed packages are created
+					# package arch filter: by index of arch in unique values
+					archs_passed = [not ((exclude_arch and x in exclude_arch) or (arch and x not in arch)) for x in packages.archs_values]
+					# package relations filter: by masks of unique relations
+					provides_mask = packages.relations_mask(provides) if provides else None
+					requires_mask = packages.relations_mask(requires) if requires else None
+					for i, (package_name, package_arch) in enumerate(zip(packages.names, packages.archs)):
+						# filter package
+						if not archs_passed[package_arch]:
+							# package arch filter
+							continue
+						if args.exclude_devel:
+							# package filter for test/debug/devel
+							if DEVEL_PACKAGE_NAMES_RE.search(package_name):
+								continue
+						if package_name_filter and not package_name_filter.is_match(package_name):
+							# package name filter
+							continue
+						if provides_mask is not None and not packages.has_relations(packages.provides, packages.provides_offsets, i, provides_mask):
+							# package provides filter
+							continue
+						if requires_mask is not None and not packages.has_relations(packages.requires, packages.requires_offsets, i, requires_mask):
+							# package requires filter
+							continue
+						# yield package
+						yield packages.package(i)
 
 		args = parse_args()
 
@@ -622,11 +994,12 @@ Advanced usage:
 			print(' '.join(argv))
 
 		# packets filters
-		arch: tuple[str] | None = tuple(args.arch.split(' ')) if args.arch else None
-		exclude_arch: tuple[str] | None = tuple(args.exclude_arch.split(' ')) if args.exclude_arch else None
+		arch: frozenset[str] | None = frozenset(args.arch.split(' ')) if args.arch else None
+		exclude_arch: frozenset[str] | None = frozenset(args.exclude_arch.split(' ')) if args.exclude_arch else None
 		package_name_filter = PackageNameFilter(args.package) if args.package else None
-		# repositories path
-		repos_path = Path(args.repos_path)
+		# repositories path # made absolute once: joined paths are absolute
+		repos_path = Path(args.repos_path).absolute()
+		repos_path_str = str(repos_path)
 
 		match args.subparser:
 
@@ -658,7 +1031,8 @@ Advanced usage:
 						try:
 							return Conf(
 								args.url or buff['url'],
-								space_sep(args.repos) or buff['repos'],
+								# same repository named twice is downloaded once
+								tuple(dict.fromkeys(space_sep(args.repos) or buff['repos'])),
 								space_sep(args.arch) or buff.get('arch', tuple()),
 								)
 						except (TypeError, KeyError): raise MissingArgument
@@ -666,22 +1040,38 @@ Advanced usage:
 					def save_to_toml(self, file_path: str):
 						with open(file_path, 'w') as f:
 							for k, v in asdict(self).items():
-								if issubclass(type(v), str):
+								if isinstance(v, str):
 									f.write(f'{k} = "{v}"\n')
-								elif issubclass(type(v), (tuple, list)):
+								elif isinstance(v, (tuple, list)):
 									f.write(f'{k} = [{','.join('"'+x+'"' for x in v)}]\n')
 
-				def download_file(url: str) -> bytes | None:
-					h_response = session.get(url)
-					if h_response.status_code != 200:
-						buff = f'Can\'t download URL: status_code={h_response.status_code} {url}'
-						log(buff)
-						return None
-					return h_response.content
+				def download_file(url: str, file_path: str | None = None) -> bytes | bool | None:
+					'returns downloaded content; content is streamed to file_path if set'
+					with session.get(url, stream=file_path is not None) as h_response:
+						if h_response.status_code != 200:
+							buff = f'Can\'t download URL: status_code={h_response.status_code} {url}'
+							log(buff)
+							return None
+						if file_path is None:
+							return h_response.content
+						# download to temporary file: interrupted download does not leave partial file
+						# unique name: same file may be downloaded by several threads at once
+						fd, part_path = tempfile.mkstemp(DOWNLOAD_PART_SUFFIX, dir=os.path.dirname(file_path))
+						try:
+							with open(fd, 'wb') as f:
+								if hasattr(os, 'fchmod'):
+									os.fchmod(fd, file_mode)  # mkstemp creates file readable by owner only
+								for chunk in h_response.iter_content(DOWNLOAD_CHUNK_SIZE):
+									f.write(chunk)
+						except BaseException:
+							Path(part_path).unlink(missing_ok=True)
+							raise
+						os.replace(part_path, file_path)
+						return True
 
-				def download_repomd(url: str) -> tuple[Document, bytes] | None:
+				def download_repomd(url: str) -> tuple[Repomd, bytes] | None:
 					if (buff := download_file(url)):
-						if (repomd := get_repomd(minidom.parseString(buff))):
+						if (repomd := get_repomd(ElementTree.fromstring(buff))):
 							return (repomd, buff)
 					return None
 
@@ -690,50 +1080,55 @@ Advanced usage:
 					'download file from url+path url to repo_path+path'
 					url += path
 					path = repo_path.joinpath(path)
-					log(f'{prefix+' ' if prefix else ''}{str(path.absolute())[len(str(repos_path.absolute()))+1:]}{f' ({format_size(package.size)})' if package else ''}')
+					# file log messages are written together: files are downloaded in parallel
+					msgs = [f'{prefix+' ' if prefix else ''}{str(path)[len(repos_path_str)+1:]}{f' ({format_size(package.size)})' if package else ''}']
 					if not overwrite and path.exists():
 						# file exists # try verify file to keep it
 						if package and path.stat().st_size != package.size:
-							log(f'\tfile corrupted (size {path.stat().st_size:_} != expected {package.size:_}) {package.href}')
+							msgs.append(f'\tfile corrupted (size {path.stat().st_size:_} != expected {package.size:_}) {package.href}')
 						else:
 							# keep file
-							log('\tkeep')
+							msgs.append('\tkeep')
+							log(*msgs)
 							return True
 					# download file
-					log(f'\t{url}')
+					msgs.append(f'\t{url}')
+					log(*msgs)
 					if not args.dummy:
 						path.parent.mkdir(exist_ok=True, parents=True)
-						if (buff := download_file(url)):
-							with open(path.absolute(), 'wb') as f:
-								f.write(buff)
+						download_file(url, str(path))
 					return True
 
-				def log(msg: str):
-					if args.verbose:
-						print(msg)
-					log_f.write('\t')
-					log_f.write(msg)
-					log_f.write('\n')
+				def log(*msgs: str):
+					'writes messages as log lines; thread safe'
+					with log_lock:
+						if args.verbose:
+							print(*msgs, sep='\n')
+						log_f.write(''.join(f'\t{msg}\n' for msg in msgs))
 
 				if args.redownload:
 					args.keep_meta = args.keep_conf = args.keep_cache = True
 
 				# download repos meta files: repodata
 				session = requests.Session()
+				adapter = HTTPAdapter(pool_maxsize=args.jobs,
+					max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504), raise_on_status=False))
+				session.mount('http://', adapter)
+				session.mount('https://', adapter)
+				log_lock = Lock()
+				os.umask(umask := os.umask(0))  # umask is read by set only
+				file_mode = 0o666 & ~umask  # downloaded files mode as created by open()
 				repos_path.mkdir(exist_ok=True, parents=True)
-				with open(str(repos_path.joinpath(DOWNLOAD_LOG_FILE_NAME).absolute()), 'a') as log_f:
+				with open(str(repos_path.joinpath(DOWNLOAD_LOG_FILE_NAME)), 'a', buffering=1 << 16) as log_f:
 					# write log timestamp
-					log_f.write(datetime.now(timezone.utc).replace(microsecond=0).astimezone().isoformat())
-					log_f.write('\n')
-					log_f.write('\t'+' '.join(argv))
-					log_f.write('\n')
+					log_f.write(f'{datetime.now(timezone.utc).replace(microsecond=0).astimezone().isoformat()}\n\t{' '.join(argv)}\n')
 
 					if args.dummy:
 						log('Dummy - not download !')
 
 					# load config from .toml file
 					try:
-						conf = Conf.load_from_toml(str(repos_path.joinpath(CONF_TOML_FILE_NAME).absolute()))
+						conf = Conf.load_from_toml(str(repos_path.joinpath(CONF_TOML_FILE_NAME)))
 					except MissingArgument:
 						print('Missing arguments: --url, --repos\nUse -h for help message')
 						exit(-1)
@@ -742,75 +1137,100 @@ Advanced usage:
 					if not (args.keep_meta or args.dummy):
 						if args.verbose:
 							print('\tDOWNLOAD repositories meta files')
-						for repo in conf.repos:
+
+						def download_repository_meta(repo: str):
+							'download repository meta files; runs in thread'
 							repo_path, repo_url = repos_path.joinpath(repo), conf.url.format(repo=repo)
 							# download repomd.xml file
 							repomd_path = 'repodata/repomd.xml'
+							repomd_file, repomd_url = str(repo_path.joinpath(repomd_path)), repo_url + repomd_path
 							# check repository for newest version
 							if not args.dummy:
 								repomd_version_current = None
-								if (repomd := get_repomd(_open_xml_file(str(repo_path.joinpath(repomd_path).absolute())))):
+								if (repomd := get_repomd(_read_xml_file(repomd_file))):
 									repomd_version_current = repomd.revision
-								if (buff := download_repomd(repo_url+repomd_path)):
+								if (buff := download_repomd(repomd_url)):
 									repomd, buff = buff
 									if repomd_version_current is None or repomd_version_current != repomd.revision:
 										# is new repository version
 										if repomd_version_current:
 											# save previous repomd.xml version
 											log(f'\tNew version of repo {repo}: {repomd.revision} current version {repomd_version_current}')
-											repo_path.joinpath(repomd_path).rename(
-												repo_path.joinpath(repomd_path+'.'+repomd_version_current))
+											os.replace(repomd_file, f'{repomd_file}.{repomd_version_current}')
 										else:
 											log(f'\tNew version of repo {repo}: {repomd.revision}')
-										# save new repomd.xml version
-										repo_path.joinpath(repomd_path).parent.mkdir(exist_ok=True, parents=True)
-										with open(str(repo_path.joinpath(repomd_path).absolute()), 'wb') as f:
-											f.write(buff)
+									# save downloaded repomd.xml: it is not requested again
+									os.makedirs(os.path.dirname(repomd_file), exist_ok=True)
+									with open(repomd_file, 'wb') as f:
+										f.write(buff)
+									log(f'{repo}/{repomd_path}', f'\t{repomd_url}')
 								else:
-									log(f'CAN\'T PARSE repo {repo}: {repo_url+repomd_path}')
-									continue
-							# download primary and filelists files
-							if download_and_save_file(repo_url, repo_path, repomd_path):
-								if (repomd := get_repomd(_open_xml_file(str(repo_path.joinpath(repomd_path).absolute())))):
-									download_and_save_file(repo_url, repo_path, repomd.filelists_url, not args.keep_meta)
-									download_and_save_file(repo_url, repo_path, repomd.primary_url, not args.keep_meta)
-							log_f.flush()
+									log(f'CAN\'T PARSE repo {repo}: {repomd_url}')
+									return
+								# download primary and filelists files
+								download_and_save_file(repo_url, repo_path, repomd.filelists_url, not args.keep_meta)
+								download_and_save_file(repo_url, repo_path, repomd.primary_url, not args.keep_meta)
+							with log_lock:
+								log_f.flush()
+
+						with ThreadPoolExecutor(args.jobs) as executor:
+							for _ in executor.map(download_repository_meta, conf.repos): pass
 
 					# save config to .toml file
 					if not args.keep_conf:
-						conf.save_to_toml(str(repos_path.joinpath(CONF_TOML_FILE_NAME).absolute()))
+						conf.save_to_toml(str(repos_path.joinpath(CONF_TOML_FILE_NAME)))
 
 					# update meta cache # serialize packages and save to binary file
 					if not args.keep_cache:
 						log('Update meta cache...')
 						if args.verbose > 1:
 							log(f'\theader: {', '.join(PACKAGE_CACHE_HEADER)}')
-						packages_cache, count, packages = [], 0, {}
 						# read repos versions
-						repos_versions: dict[str, str] = dict()  # dict[repo_name, version]
-						for repomd, repo_path in iter_repositories_repomds(str(repos_path.absolute())):
-							repos_versions[repo_path.name] = repomd.revision
+						repos = list(iter_repositories_repomds(repos_path_str))
+						repos_versions: dict[str, str] = {repo_path.name: repomd.revision for repomd, repo_path in repos}  # dict[repo_name, version]
 						if args.verbose:
 							print_repos_versions(repos_versions)
-						# read packages
-						log('\tadd packages...')
-						for package in iter_repositories_packages(str(repos_path.absolute()), True):
-							packages_cache.append(package)
-							packages[package] = package
-							count += 1
-						log(f'\t\tpackages: {count:_}')
-						# read packages files
-						log('\tadd files...')
-						files_count = 0
-						for package_files in iter_repositories_packages(str(repos_path.absolute()), file_list=True):
-							packages[package_files].files = package_files.files  # add files to package
-							files_count += len(package_files.files)
-						log(f'\t\tfiles: {sum((len(x.files) for x in packages_cache if x.files)):_}')
-						# save meta cache # serialize to binary file
-						with open(str(repos_path.joinpath(PACKAGES_CACHE_FILE_NAME).absolute()), 'wb') as f:
-							# serialize: magic header, repositories versions, packages
-							pickle.dump((PACKAGE_CACHE_HEADER, repos_versions, tuple(packages_cache)), f)
-						del packages
+						cache_path = str(repos_path.joinpath(PACKAGES_CACHE_FILE_NAME))
+						# read packages tables of repositories with unchanged version from previous meta cache
+						cache_tables: dict[str, PackageTable] = {}  # dict[repo_name, packages]
+						try:
+							with open(cache_path, 'rb') as f, _gc_disabled():
+								for repo, version in (read_meta_cache_header(f) or {}).items():
+									if (packages := read_meta_cache_table(f)) is None:
+										# not valid cache: rebuild all repositories
+										cache_tables.clear()
+										break
+									if repos_versions.get(repo) == version:
+										cache_tables[repo] = packages
+						except Exception:
+							# no or damaged previous cache: rebuild all repositories
+							cache_tables.clear()
+						if cache_tables:
+							log(f'\tkeep packages and files: {', '.join(cache_tables)}')
+						# read packages and files of changed repositories # save meta cache # serialize to binary file
+						log('\tadd packages and files...')
+						packages_count = files_count = 0
+						# write to temporary file: failed parsing does not damage previous cache
+						cache_part_path = cache_path + DOWNLOAD_PART_SUFFIX
+						try:
+							with closing(iter_repositories_frames([x for x in repos if x[1].name not in cache_tables])) as frames, \
+									open(cache_part_path, 'wb', buffering=CACHE_BUFFER_SIZE) as f:
+								# serialize: header (magic header, repositories versions), packages table for each repository
+								write_meta_cache_header(f, repos_versions)
+								for _, repo_path in repos:
+									if (packages := cache_tables.pop(repo_path.name, None)) is not None:
+										write_meta_cache_table(f, packages)
+										packages_count_, files_count_ = len(packages), packages.files_count()
+									else:
+										frame, packages_count_, files_count_ = next(frames)
+										f.write(frame)
+									packages_count += packages_count_
+									files_count += files_count_
+						except BaseException:
+							Path(cache_part_path).unlink(missing_ok=True)
+							raise
+						os.replace(cache_part_path, cache_path)
+						log(f'\t\tpackages: {packages_count:_}', f'\t\tfiles: {files_count:_}')
 
 					# download repos packages # use packages cache
 					if conf.arches and not args.dummy:
@@ -837,25 +1257,34 @@ Advanced usage:
 						log(f'\t       repos: {', '.join(conf.repos)}')
 						log(f'\t      arches: {', '.join(conf.arches)}')
 						log(f'\tcount (size): {len(packages)} ({format_size(sum(x.size for x in packages))})')
-						for i, package in enumerate(packages):
-							# download package file
-							repo_url = conf.url.format(repo=package.repo)
-							time_ = timedelta(seconds=(datetime.now() - start_time).seconds)
+						packages_count, progress_lock = 0, Lock()
+						# repository URL and path by repository name
+						repos_urls = {x: conf.url.format(repo=x) for x in conf.repos}
+						repos_paths = {x: repos_path.joinpath(x) for x in conf.repos}
+
+						def download_package(package: Package):
+							'download package file; runs in thread'
+							nonlocal packages_count, downloaded_size
+							with progress_lock:
+								packages_count += 1
+								time_ = timedelta(seconds=(datetime.now() - start_time).seconds)
+								prefix = template_str.format(time=time_, packages_count=packages_count, downloaded_size=format_size(downloaded_size),
+									remainimg_size=format_size(download_total-downloaded_size))
+								downloaded_size += package.size if package.href else 0
 							if package.href:
-								download_and_save_file(repo_url, repos_path.joinpath(package.repo), package.href, False, package,
-									template_str.format(time=time_, packages_count=i+1, downloaded_size=format_size(downloaded_size),
-							 			remainimg_size=format_size(download_total-downloaded_size)))
-								downloaded_size += package.size
-							log_f.flush()
+								download_and_save_file(repos_urls[package.repo], repos_paths[package.repo], package.href, False, package, prefix)
+							with log_lock:
+								log_f.flush()
+
+						with ThreadPoolExecutor(args.jobs) as executor:
+							for _ in executor.map(download_package, packages): pass
 						if packages:
-							log(f'\tDOWNLOADED packages: {i+1} / {timedelta(seconds=(datetime.now() - start_time).seconds)}')
+							log(f'\tDOWNLOADED packages: {packages_count} / {timedelta(seconds=(datetime.now() - start_time).seconds)}')
 
 			case 'architectures' | 'a':
 				if args.count:
 					# show table: arches and packages count # count packages
-					archs = {}
-					for package in iter_packages():
-						archs[package.arch] = archs.get(package.arch, 0) + 1
+					archs = Counter(package.arch for package in iter_packages())
 					# show table
 					template = f'{{i}} {{arch:{max(len(x) for x in archs.keys())}}} {{count:{len(str(max(archs.values())))}}}'
 					for i, (arch, count) in enumerate(sorted(archs.items(), key=lambda x: x[0])):
@@ -865,9 +1294,7 @@ Advanced usage:
 							print(arch, count)
 				else:
 					# count packages
-					archs = set()
-					for package in iter_packages():
-						archs.add(package.arch)
+					archs = {package.arch for package in iter_packages()}
 					# show arches
 					for i, arch in enumerate(sorted(archs)):
 						if args.C:
@@ -877,9 +1304,11 @@ Advanced usage:
 
 			case 'filter' | 'f':
 				summary_filter = PackageSummaryFilter(args.summary) if args.summary else None
-				provides_filter: tuple[str] | None = args.provides.split(' ') if args.provides else None
-				requires_filter: tuple[str] | None = args.requires.split(' ') if args.requires else None
-				files_filter: tuple[str] | None = args.files.split(' ') if args.files else None
+				provides_filter: tuple[str] | None = tuple(args.provides.split(' ')) if args.provides else None
+				requires_filter: tuple[str] | None = tuple(args.requires.split(' ')) if args.requires else None
+				files_filter: tuple[str] | None = tuple(args.files.split(' ')) if args.files else None
+				# relations filters applied to cache: provides filter by files needs package files
+				is_provides_files = provides_filter and any(x.startswith('/') for x in provides_filter)
 
 				if args.out == 'dot' and not package_name_filter:
 					print(f'Out format "dot" allowed only for one package. Define package name flter. See help: {argv[0]} -h')
@@ -887,22 +1316,20 @@ Advanced usage:
 
 				def _iter_packages() -> Iterator[Package]:
 					'iters packages according filters'
-					for package in iter_packages():
-						# filter package
-						if summary_filter and not summary_filter.is_match(package):
-							# package summary and description filter
-							continue
-						if files_filter and not package.has_files(files_filter):
-							# package files filter
-							continue
-						if provides_filter and not package.is_provides(provides_filter):
-							# package provides filter
-							continue
-						if requires_filter and not package.is_requires(requires_filter):
-							# package requires filter
-							continue
-						# yield package
-						yield package
+					with closing(iter_packages(None if is_provides_files else provides_filter, requires_filter)) as packages:
+						for package in packages:
+							# filter package
+							if summary_filter and not summary_filter.is_match(package):
+								# package summary and description filter
+								continue
+							if files_filter and not package.has_files(files_filter):
+								# package files filter
+								continue
+							if is_provides_files and not package.is_provides(provides_filter):
+								# package provides filter
+								continue
+							# yield package
+							yield package
 
 				if args.repos_path:
 					# read repositories path # show packages from repositories
@@ -915,10 +1342,8 @@ Advanced usage:
 							for package in _iter_packages():
 								repo_max_len = max(repo_max_len, len(package.repo))
 								package_name_max_len = max(package_name_max_len, len(package.name))
-								for file_path in package.files or []:
-									# add package files # apply files filter
-									if not package.is_text_filtered(file_path, files_filter):
-										continue  # file not passed
+								for file_path in package.iter_files(files_filter):
+									# add package files according files filter
 									files[file_path] = package
 									file_path_max_len = max(file_path_max_len, len(file_path))
 							# print files with packages
@@ -951,7 +1376,9 @@ Advanced usage:
 
 						case 'dot' | 'tree' | 'tree-full' | 'rdot' | 'rtree' | 'rtree-full':
 							# print packages by package relations according to filters
-							root_package = next(_iter_packages())
+							with closing(_iter_packages()) as packages:
+								# first package only: cache file is closed
+								root_package = next(packages, None)
 							if not root_package:
 								print(f'Out format "dot" allowed only for one package. Define package name flter. See help: {argv[0]} -h')
 								exit(-1)
@@ -959,17 +1386,46 @@ Advanced usage:
 							tree_full = args.out in ('tree-full', 'rtree-full')
 							rtree = args.out in ('rtree', 'rtree-full')
 
-							def _iter_required_packages(package: Package) -> Iterator[Package]:
-								'iters packages that provides required relations by package'
-								for package_ in packages:
-									if any(package.iter_relations(package_, rtree)):
-										yield package_
+							def get_relations_index() -> dict[str, list[int]]:
+								'returns packages indexes by relation name: reverse - by requires; by provides and required files otherwise'
+								index: dict[str, list[int]] = {}
+								if rtree:
+									for i, package in enumerate(packages):
+										for name in {x.name for x in package.requires or ()}:
+											index.setdefault(name, []).append(i)
+								else:
+									# files are indexed only if required
+									files = {x.name for package in packages for x in package.requires or () if x.name.startswith('/')}
+									for i, package in enumerate(packages):
+										names = {x.name for x in package.provides or () if not x.name.startswith('/')}
+										if files and package.files:
+											names.update(files.intersection(package.files))
+										for name in names:
+											index.setdefault(name, []).append(i)
+								return index
+
+							def _iter_required_packages(package: Package) -> Iterator[int]:
+								'iters indexes of packages that provides required relations by package; packages are iterated in packages order'
+								ids = set()
+								if rtree:
+									# packages that require package provides or files
+									for provide in package.provides or ():
+										if not provide.name.startswith('/'):
+											ids.update(relations_index.get(provide.name, ()))
+									for file in package.files or ():
+										ids.update(relations_index.get(file, ()))
+								else:
+									# packages that provide package requires: relations or files
+									for require in package.requires or ():
+										ids.update(relations_index.get(require.name, ()))
+								yield from sorted(ids)
 
-							def provides_packages(package: Package):
+							def provides_packages(package_id: int):
 								nonlocal print_indent
-								if package in provided_packages:
+								if provided_packages[package_id]:
 									return
-								provided_packages.add(package)
+								provided_packages[package_id] = 1
+								package = packages[package_id]
 								# process new package
 								print_indent += '\t'
 								if not package.requires:
@@ -981,26 +1437,29 @@ Advanced usage:
 								# if args.verbose > 0:
 								# 	print(print_indent, 'Requirements of package:', repo_name, package.name)
 								# iter next level: required packages
-								for provides_package in _iter_required_packages(package):
+								for provides_package_id in _iter_required_packages(package):
+									provides_package = packages[provides_package_id]
 									# print(f'REL {requires_rel} {provides_package}')
-									if provides_package in provided_packages:
+									if provided_packages[provides_package_id]:
 										if tree_full:
 											print(print_indent, provides_package.to_str(True, True), '=', '<ALREADY>', ', '.join(str(x[0]) for x in package.iter_relations(provides_package, rtree)))
 									else:
 										if args.verbose > 0:
 											print(print_indent, provides_package.to_str(True, True), '=', ', '.join(str(x[0]) for x in package.iter_relations(provides_package, rtree)))
 										# tree structure: next level
-										provides_packages(provides_package)
+										provides_packages(provides_package_id)
 								print_indent = print_indent[:-1]
 
-							provided_packages: set[Package] = set()
 							print_indent = ''
 							# tree structure: root
 							print(root_package.to_str())
 							package_name_filter = None  # clear filter by package name
-							packages = tuple(_iter_packages())  # get packages for tree
+							with _gc_disabled():
+								packages = tuple(_iter_packages())  # get packages for tree
+								relations_index = get_relations_index()
 							print(f'Packages: {len(packages)}')
-							provides_packages(root_package)
+							provided_packages = bytearray(len(packages))  # processed packages flags by package index
+							provides_packages(next(i for i, x in enumerate(packages) if x.repo == root_package.repo and x == root_package))
 
 						case _:
 							# text # print packages according to filters